@@ -35,10 +35,11 @@ setup(
     install_requires=[
         "Pillow>=9.0.0",
         "exifread>=3.0.0",
-        "geopy>=2.3.0",
+        "geopy[requests]>=2.3.0",
     ],
     extras_require={
         "video": ["ffmpeg-python>=0.2.0"],
+        "fast": ["numpy>=1.17", "orjson>=3.0"],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import random
+import re
+
+from vibe_media_rename.core import MediaRenamer, _parse_location_string
+
+# The three prefix patterns _clean_original_filename used to apply one after another
+_SEQUENTIAL_PATTERNS = [
+    re.compile(r'^.+?_\d{4}-\d{2}-\d{2}_'),
+    re.compile(r'^[^_]+_[^_]+_[^_]+_[^_]+_\d{8}_\d{6}_'),
+    re.compile(r'^\d{8}_\d{6}_'),
+]
+
+# The regex the ISO 6709 branch of _parse_location_string used before the scanner
+_ISO_6709_RE = re.compile(r'([+-]\d+\.?\d*)([+-]\d+\.?\d*)', re.ASCII)
+_SIMPLE_LATLON_RE = re.compile(r'(-?\d+\.?\d*),\s*(-?\d+\.?\d*)')
+
+
+def _clean_sequential(renamer, original_name):
+    cleaned = original_name
+    for pattern in _SEQUENTIAL_PATTERNS:
+        cleaned = pattern.sub('', cleaned)
+    if not cleaned.strip():
+        cleaned = original_name
+    return renamer._clean_filename_part(cleaned)
+
+
+def _parse_location_regex(location_str):
+    for pattern in (_ISO_6709_RE, _SIMPLE_LATLON_RE):
+        match = pattern.match(location_str)
+        if match:
+            try:
+                return (float(match.group(1)), float(match.group(2)))
+            except ValueError:
+                return None
+    return None
+
+
+def test_known_prefixes():
+    renamer = MediaRenamer(use_cache=False)
+    cases = {
+        "IMG_1234": "IMG_1234",
+        "Central Park_2025-01-15_IMG_1234": "IMG_1234",
+        "CentralPark_NewYork_NewYork_UnitedStates_20250115_143022_IMG_1234": "IMG_1234",
+        "20250115_143022_IMG_1234": "IMG_1234",
+        "Loc_2023-01-01_20230101_101010_x": "x",
+        "20250115_143022_": "20250115_143022",
+    }
+    for original, expected in cases.items():
+        assert renamer._clean_original_filename(original) == expected, original
+
+
+def test_prefix_regex_matches_sequential_patterns(trials=100000, seed=1234):
+    renamer = MediaRenamer(use_cache=False)
+    rng = random.Random(seed)
+    tokens = ['A', 'B C', '_', '_', '_', '2023-01-01', '20230101', '101010', 'x', 'IMG', '1', '-', 'é']
+    for _ in range(trials):
+        name = ''.join(rng.choice(tokens) for _ in range(rng.randint(0, 14)))
+        assert renamer._clean_original_filename(name) == _clean_sequential(renamer, name), name
+
+
+def test_location_scan_matches_regex(trials=100000, seed=1234):
+    rng = random.Random(seed)
+    alphabet = '+-.0123456789/, x'
+    for _ in range(trials):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+        assert _parse_location_string(text) == _parse_location_regex(text), text
+    assert _parse_location_string("+37.7290-122.4135/") == (37.729, -122.4135)
+    assert _parse_location_string("+37.7290-122.4135+010.000/") == (37.729, -122.4135)
+
+
+if __name__ == "__main__":
+    test_known_prefixes()
+    test_prefix_regex_matches_sequential_patterns()
+    test_location_scan_matches_regex()
+    print("Filename cleaning and location parsing match their reference implementations")
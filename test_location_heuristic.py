@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import vibe_media_rename.core as core
+from vibe_media_rename.core import FileMetadata, MediaRenamer, HEURISTIC_MAX_TIME_DIFF
+
+
+def _brute_force(files):
+    """The original O(N*M) scan: closest located file in time, earliest wins ties."""
+    sorted_files = sorted(files, key=lambda f: f.modification_time)
+    located = [f for f in sorted_files if f.latitude is not None and f.longitude is not None]
+    expected = {}
+    for unlocated in sorted_files:
+        if unlocated.latitude is not None and unlocated.longitude is not None:
+            continue
+        closest = None
+        min_diff = None
+        for candidate in located:
+            diff = abs((unlocated.modification_time - candidate.modification_time).total_seconds())
+            if min_diff is None or diff < min_diff:
+                min_diff = diff
+                closest = candidate
+        if closest and min_diff <= HEURISTIC_MAX_TIME_DIFF:
+            expected[unlocated.filepath] = (closest.latitude, closest.longitude)
+    return expected
+
+
+def _random_batch(rng, size):
+    base = datetime(2023, 1, 1)
+    files = []
+    for i in range(size):
+        # Plenty of exact ties and gaps right at the one hour limit
+        offset = rng.choice([0, 600, 1200, 3600, 3601, 4000, rng.randint(0, 20000)])
+        mtime = base + timedelta(seconds=offset, microseconds=rng.choice([0, 0, rng.randint(0, 999999)]))
+        located = rng.random() < 0.4
+        files.append(FileMetadata(
+            filepath=Path(f"f{i}.jpg"),
+            modification_time=mtime,
+            creation_date=None,
+            latitude=float(i) if located else None,
+            longitude=float(-i) if located else None
+        ))
+    return files
+
+
+def _check(use_numpy, trials=300, max_size=40, seed=1234):
+    renamer = MediaRenamer(use_cache=False)
+    rng = random.Random(seed)
+    saved_np = core.np
+    if not use_numpy:
+        core.np = None
+    try:
+        for _ in range(trials):
+            files = _random_batch(rng, rng.randint(0, max_size))
+            expected = _brute_force(files)
+            for f in files:
+                if f.latitude is not None:
+                    expected[f.filepath] = (f.latitude, f.longitude)
+            with contextlib.redirect_stdout(io.StringIO()):
+                renamer.apply_location_heuristic(files)
+            for f in files:
+                assert (f.latitude, f.longitude) == expected.get(f.filepath, (None, None)), f.filepath
+    finally:
+        core.np = saved_np
+
+
+def test_bisect_matches_brute_force():
+    _check(use_numpy=False)
+
+
+def test_numpy_matches_brute_force():
+    if core.np is None:
+        print("numpy not installed, skipping")
+        return
+    _check(use_numpy=True)
+
+
+if __name__ == "__main__":
+    test_bisect_matches_brute_force()
+    test_numpy_matches_brute_force()
+    print("Location heuristic matches the brute-force reference")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from vibe_media_rename.core import _parse_exif_datetime, _parse_ffprobe_output, _parse_video_datetime
+
+MTIME = datetime(2024, 1, 1, 10, 0, 0)
+
+
+def _ffprobe(format_tags):
+    output = json.dumps({"format": {"tags": format_tags}}).encode()
+    return _parse_ffprobe_output(Path("clip.mp4"), MTIME, output)
+
+
+def test_video_datetime_formats():
+    assert _parse_video_datetime("2023-05-01 12:34:56") == datetime(2023, 5, 1, 12, 34, 56)
+    assert _parse_video_datetime("2023-05-01T12:34:56.000000Z") == datetime(2023, 5, 1, 12, 34, 56)
+    assert _parse_video_datetime("2023-05-01T12:34:56+02:00") == datetime(2023, 5, 1, 12, 34, 56)
+    for value in ("2023-05-01", "2023", "2023:05:01 12:34:56", "2023-05-01 12-34-56", "", None):
+        assert _parse_video_datetime(value) is None, value
+
+
+def test_date_only_tag_is_ignored():
+    # A bare date must not become midnight; fall through to the next tag
+    metadata = _ffprobe({"date": "2023-05-01"})
+    assert metadata.creation_date is None
+    assert metadata.modification_time == MTIME
+
+    metadata = _ffprobe({"date": "2023-05-01", "DATE": "2023-05-01 08:09:10"})
+    assert metadata.creation_date == datetime(2023, 5, 1, 8, 9, 10)
+
+
+def test_creation_time_tag():
+    metadata = _ffprobe({"creation_time": "2023-11-14T22:13:20.000000Z",
+                         "com.apple.quicktime.location.ISO6709": "+37.7290-122.4135+010.000/"})
+    assert metadata.creation_date == datetime(2023, 11, 14, 22, 13, 20)
+    assert (metadata.latitude, metadata.longitude) == (37.729, -122.4135)
+
+
+def test_exif_datetime_layout():
+    assert _parse_exif_datetime("2023:11:14 22:13:20") == datetime(2023, 11, 14, 22, 13, 20)
+    for value in ("2023-11-14 22:13:20", "    :  :     :  :  ", "0000:00:00 00:00:00", ""):
+        assert _parse_exif_datetime(value) is None, value
+
+
+if __name__ == "__main__":
+    test_video_datetime_formats()
+    test_date_only_tag_is_ignored()
+    test_creation_time_tag()
+    test_exif_datetime_layout()
+    print("Metadata date parsing behaves as expected")
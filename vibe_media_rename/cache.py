@@ -0,0 +1,167 @@
+"""
+Persistent on-disk caches used by the media renamer.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "vibe_media_rename"
+
+
+class GeocodeCache:
+    """
+    SQLite-backed store of reverse-geocoding results.
+
+    Entries are keyed by coordinates rounded by the caller, so every photo
+    taken within the same ~100 m bucket resolves to the same row. Writes are
+    left uncommitted until commit() is called, which lets a whole batch land
+    in a single transaction.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (and create if needed) the geocode cache database.
+
+        Args:
+            path: Location of the SQLite file, defaults to ~/.cache/vibe_media_rename/geocode.sqlite
+        """
+        self.path = path or DEFAULT_CACHE_DIR / "geocode.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Geocoding runs on worker threads, so access is serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            "lat_key REAL, lon_key REAL, json TEXT, "
+            "PRIMARY KEY(lat_key, lon_key))"
+        )
+        self._conn.commit()
+
+    def get(self, lat_key: float, lon_key: float) -> Optional[Dict]:
+        """Return the cached address for a rounded coordinate, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT json FROM geocode WHERE lat_key = ? AND lon_key = ?",
+                (lat_key, lon_key)
+            ).fetchone()
+        return json_loads(row[0]) if row else None
+
+    def put(self, lat_key: float, lon_key: float, address: Dict) -> None:
+        """Store an address for a rounded coordinate (pending until commit())."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (lat_key, lon_key, json) VALUES (?, ?, ?)",
+                (lat_key, lon_key, json.dumps(address))
+            )
+
+    def commit(self) -> None:
+        """Flush pending writes to disk."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class MetadataCache:
+    """
+    SQLite-backed store of metadata extracted from media files.
+
+    Rows are keyed by the file's device and inode, so an entry survives the
+    file being renamed, and are only reused while its size and mtime are
+    unchanged, so edited files are read again. The path is kept alongside
+    (as raw bytes, since file names need not be valid UTF-8) so that rows
+    for files that have since been deleted can be pruned. The
+    database runs in WAL mode so that concurrent runs do not block each other.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (and create if needed) the metadata cache database.
+
+        Args:
+            path: Location of the SQLite file, defaults to ~/.cache/vibe_media_rename/exif.sqlite
+        """
+        self.path = path or DEFAULT_CACHE_DIR / "exif.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Earlier versions keyed rows by path alone
+        self._conn.execute("DROP TABLE IF EXISTS metadata")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, path BLOB, "
+            "creation_date TEXT, latitude REAL, longitude REAL, "
+            "PRIMARY KEY(dev, ino))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_path ON files (path)")
+        self._conn.commit()
+
+    def get(self, st: os.stat_result
+            ) -> Optional[Tuple[Optional[datetime], Optional[float], Optional[float]]]:
+        """Return (creation_date, latitude, longitude) if the file is unchanged since it was cached."""
+        row = self._conn.execute(
+            "SELECT creation_date, latitude, longitude FROM files "
+            "WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+            (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        ).fetchone()
+        if row is None:
+            return None
+        creation_date, latitude, longitude = row
+        if creation_date is not None:
+            creation_date = datetime.fromisoformat(creation_date)
+        return creation_date, latitude, longitude
+
+    def put(self, path: str, st: os.stat_result, creation_date: Optional[datetime],
+            latitude: Optional[float], longitude: Optional[float]) -> None:
+        """Store the metadata read from a file (pending until commit())."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files "
+            "(dev, ino, size, mtime_ns, path, creation_date, latitude, longitude) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, os.fsencode(path),
+             creation_date.isoformat() if creation_date is not None else None,
+             latitude, longitude)
+        )
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        """Record that a cached file has been renamed (pending until commit())."""
+        self._conn.execute("UPDATE files SET path = ? WHERE path = ?",
+                           (os.fsencode(new_path), os.fsencode(old_path)))
+
+    def prune(self, directory: str, names: Set[str]) -> None:
+        """Drop rows for files in directory that are no longer among names."""
+        directory = os.fsencode(directory)
+        names = {os.fsencode(name) for name in names}
+        prefix = os.path.join(directory, b'')
+        # Range scan over the path index: everything starting with prefix
+        # sorts before prefix with its last byte (the separator) bumped by one
+        rows = self._conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ?",
+            (prefix, prefix[:-1] + bytes([prefix[-1] + 1]))
+        ).fetchall()
+        stale = [(path,) for (path,) in rows
+                 if os.path.dirname(path) == directory and os.path.basename(path) not in names]
+        self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+
+    def commit(self) -> None:
+        """Flush pending writes to disk."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self._conn.commit()
+        self._conn.close()
@@ -4,11 +4,13 @@ Command-line interface for vibe_media_rename.
 """
 
 import argparse
+import os
+import stat
 import sys
 from pathlib import Path
 from typing import List
 
-from .core import MediaRenamer
+from .core import MediaRenamer, MAX_EXTRACT_WORKERS, PHOTO_EXTENSIONS, VIDEO_EXTENSIONS
 
 
 def main():
@@ -22,6 +24,7 @@ Examples:
   vibe_media_rename /path/to/photos/*.jpg
   vibe_media_rename --dry-run /Volumes/Dzianis-2/LifeHistory/2025/*
   vibe_media_rename photo1.jpg video1.mp4 photo2.heic
+  vibe_media_rename --dry-run /path/to/photos/
 
 The tool will:
 1. Extract GPS coordinates and creation dates from media files
@@ -38,7 +41,7 @@ Supported formats:
     parser.add_argument(
         'files',
         nargs='+',
-        help='Media files to process (supports wildcards)'
+        help='Media files or directories to process (supports wildcards)'
     )
     
     parser.add_argument(
@@ -47,6 +50,21 @@ Supported formats:
         help='Show what would be renamed without actually renaming files'
     )
     
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Maximum number of files to read metadata from in parallel '
+             '(default: number of CPUs, up to 8; use 1-2 for spinning disks)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the on-disk geocoding and metadata caches'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -59,14 +77,42 @@ Supported formats:
     except SystemExit:
         return
     
-    # Convert string paths to Path objects and validate
+    # Convert string paths to Path objects and validate; the stat() results
+    # are handed to the renamer so no file is stat()ed twice
     filepaths: List[Path] = []
+    stats: List[os.stat_result] = []
     for file_arg in args.files:
-        filepath = Path(file_arg)
-        if filepath.exists():
-            filepaths.append(filepath)
-        else:
+        try:
+            st = os.stat(file_arg)
+        except OSError:
             print(f"Warning: File not found: {file_arg}")
+            continue
+        
+        if stat.S_ISDIR(st.st_mode):
+            # Directory listings carry the file type, so only media files get a stat()
+            try:
+                with os.scandir(file_arg) as entries:
+                    entries = sorted(entries, key=lambda e: e.name)
+            except OSError as e:
+                print(f"Warning: Cannot read directory: {file_arg} ({e.strerror})")
+                continue
+            
+            for entry in entries:
+                suffix = os.path.splitext(entry.name)[1].lower()
+                if suffix in PHOTO_EXTENSIONS or suffix in VIDEO_EXTENSIONS:
+                    try:
+                        if not entry.is_file():
+                            continue
+                        entry_stat = entry.stat()
+                    except OSError:
+                        # Removed (or made unreadable) since the directory was listed
+                        print(f"Warning: File not found: {entry.path}")
+                        continue
+                    filepaths.append(Path(entry.path))
+                    stats.append(entry_stat)
+        else:
+            filepaths.append(Path(file_arg))
+            stats.append(st)
     
     if not filepaths:
         print("Error: No valid files found to process.")
@@ -86,8 +132,13 @@ Supported formats:
     
     # Create renamer instance and process files
     try:
-        renamer = MediaRenamer(dry_run=args.dry_run)
-        renamer.process_files(filepaths)
+        # main() only runs as the entry point, so worker processes are safe
+        # to use by default here
+        jobs = args.jobs or min(os.cpu_count() or 1, MAX_EXTRACT_WORKERS)
+        renamer = MediaRenamer(dry_run=args.dry_run, use_cache=not args.no_cache,
+                               jobs=jobs)
+        renamer.process_files(filepaths, stats)
+        renamer.close()
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")
         sys.exit(1)
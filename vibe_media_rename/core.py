@@ -2,24 +2,36 @@
 Core functionality for media file metadata extraction and renaming.
 """
 
+import asyncio
+import bisect
 import json
+import multiprocessing
 import os
 import re
+import shutil
+import sqlite3
 import subprocess
 import sys
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
 
 try:
     from PIL import Image
-    from PIL.ExifTags import TAGS, GPSTAGS
 except ImportError:
     print("Error: PIL (Pillow) not installed. Run: pip install Pillow")
     sys.exit(1)
 
 try:
+    from geopy.adapters import RequestsAdapter
     from geopy.geocoders import Nominatim
+    from geopy.extra.rate_limiter import RateLimiter
     from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 except ImportError:
     print("Error: geopy not installed. Run: pip install geopy")
@@ -31,9 +43,101 @@ except ImportError:
     print("Error: exifread not installed. Run: pip install exifread")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from .cache import GeocodeCache, MetadataCache
+
+# Coordinates are rounded to this many decimals (~110 m) before geocoding
+GEOCODE_PRECISION = 3
+
+# Optional self-hosted Nominatim endpoint, e.g. http://localhost:8080
+NOMINATIM_URL_ENV = "VIBE_NOMINATIM_URL"
+
+# The public Nominatim usage policy allows at most one request per second
+PUBLIC_NOMINATIM_DELAY = 1.05
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.tiff', '.tif', '.heic')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.m4v', '.3gp')
+
+# dataclass(slots=True) needs Python 3.10+; older versions get a regular dataclass
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Files without GPS borrow coordinates from a located file taken within this many seconds
+HEURISTIC_MAX_TIME_DIFF = 3600
+
+# Most filesystems limit a single path component to 255 characters
+MAX_FILENAME_LENGTH = 255
+
+# Default upper bound on metadata extraction worker processes
+MAX_EXTRACT_WORKERS = 8
+
+# Photos handed to each worker process per task, to amortize IPC overhead
+EXTRACT_CHUNKSIZE = 8
+
+# exifread matches stop_tag against the bare tag name and only stops the
+# current IFD, so this ends the GPS IFD right after the last field we read
+EXIF_STOP_TAG = 'GPSLongitude'
+
+# Pointer tags for the Exif and GPS sub-IFDs
+EXIF_IFD_POINTER = 0x8769
+GPS_IFD_POINTER = 0x8825
+
+# Tag ids read by the PIL fallback, looked up directly instead of mapping
+# every tag through PIL.ExifTags names
+EXIF_DATETIME = 0x0132
+EXIF_DATETIME_ORIGINAL = 0x9003
+GPS_LATITUDE_REF = 0x0001
+GPS_LATITUDE = 0x0002
+GPS_LONGITUDE_REF = 0x0003
+GPS_LONGITUDE = 0x0004
 
-class FileMetadata(NamedTuple):
-    """Metadata container for media files."""
+# Compiled once at import rather than on every call
+_SIMPLE_LATLON_RE = re.compile(r'(-?\d+\.?\d*),\s*(-?\d+\.?\d*)')
+# Prefixes left by earlier renames, stripped by _clean_original_filename.
+# Each optional group is tried in turn on what the previous one left, so a
+# single pass strips the same prefixes as applying them one after another:
+#   1. "Location Name_YYYY-MM-DD_" (handles spaces in location)
+#   2. "Place_City_State_Country_YYYYMMDD_HHMMSS_"
+#   3. Just a date prefix "YYYYMMDD_HHMMSS_"
+_RENAME_PREFIX_RE = re.compile(
+    r'^(?:.+?_\d{4}-\d{2}-\d{2}_)?'
+    r'(?:[^_]+_[^_]+_[^_]+_[^_]+_\d{8}_\d{6}_)?'
+    r'(?:\d{8}_\d{6}_)?'
+)
+
+# Maps characters that are not allowed in filenames to underscores
+_FS_UNSAFE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
+# Only ask ffprobe for the tags we read, which keeps its JSON output small
+_VIDEO_LOCATION_TAGS = 'location,com.apple.quicktime.location.ISO6709'
+FFPROBE_CMD = [
+    'ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_entries',
+    f'format_tags=creation_time,date,DATE,{_VIDEO_LOCATION_TAGS}'
+    f':stream_tags={_VIDEO_LOCATION_TAGS}'
+]
+FFPROBE_TIMEOUT = 30
+
+# exiftool in batch mode reads arguments from stdin, one per line
+EXIFTOOL_CMD = ['exiftool', '-stay_open', 'True', '-@', '-']
+EXIFTOOL_TIMEOUT = 30
+EXIFTOOL_ARGS = [b'-j', b'-n', b'-charset', b'filename=utf8',
+                 b'-CreateDate', b'-DateTimeOriginal', b'-GPSLatitude', b'-GPSLongitude']
+
+# Number of ffprobe subprocesses kept in flight at once
+MAX_FFPROBE_PROCESSES = 8
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class FileMetadata:
+    """Metadata container for media files (mutable, slotted where supported)."""
     filepath: Path
     modification_time: datetime
     creation_date: Optional[datetime]
@@ -42,6 +146,433 @@ class FileMetadata(NamedTuple):
     location_name: Optional[str] = None
 
 
+def extract_photo_metadata(filepath: Path, mtime: Optional[float] = None) -> FileMetadata:
+    """
+    Extract metadata from photo files using exifread (PIL as a HEIC fallback).
+    
+    Pass mtime when the file has already been stat()ed to avoid a second syscall.
+    """
+    mod_time = _modification_time(filepath, mtime)
+    creation_date = None
+    latitude = None
+    longitude = None
+    
+    try:
+        # exifread only reads the EXIF segment; MakerNotes and thumbnails are skipped
+        with open(filepath, 'rb') as f:
+            tags = exifread.process_file(f, details=False, extract_thumbnail=False,
+                                         stop_tag=EXIF_STOP_TAG)
+        
+        # Try different date tags
+        for date_tag in ['EXIF DateTimeOriginal', 'EXIF DateTime', 'Image DateTime']:
+            if date_tag in tags:
+                creation_date = _parse_exif_datetime(str(tags[date_tag]))
+                if creation_date:
+                    break
+        
+        # GPS extraction with exifread
+        if 'GPS GPSLatitude' in tags and 'GPS GPSLongitude' in tags:
+            lat_ref = str(tags.get('GPS GPSLatitudeRef', 'N'))
+            lon_ref = str(tags.get('GPS GPSLongitudeRef', 'E'))
+            
+            latitude = _convert_exifread_gps_to_decimal(
+                tags['GPS GPSLatitude'], lat_ref
+            )
+            longitude = _convert_exifread_gps_to_decimal(
+                tags['GPS GPSLongitude'], lon_ref
+            )
+        
+        # exifread's HEIC support is limited, so let PIL try, but only when a
+        # HEIF plugin (e.g. pillow-heif) is registered to open the file
+        suffix = filepath.suffix.lower()
+        if (suffix == '.heic' and not creation_date and latitude is None
+                and suffix in Image.registered_extensions()):
+            creation_date, latitude, longitude = _extract_pil_exif(filepath)
+                        
+    except Exception as e:
+        print(f"Warning: Could not extract metadata from {filepath}: {e}")
+    
+    return FileMetadata(
+        filepath=filepath,
+        modification_time=mod_time,
+        creation_date=creation_date,
+        latitude=latitude,
+        longitude=longitude
+    )
+
+
+def _extract_pil_exif(filepath: Path) -> Tuple[Optional[datetime], Optional[float], Optional[float]]:
+    """Read creation date and GPS coordinates through PIL's lazy getexif()."""
+    creation_date = None
+    latitude = None
+    longitude = None
+    
+    try:
+        img = Image.open(filepath)
+    except OSError:
+        # No decoder for this file; nothing more to learn from PIL
+        return creation_date, latitude, longitude
+    
+    with img:
+        exif_data = img.getexif()
+        
+        # DateTime lives in IFD0, DateTimeOriginal in the Exif sub-IFD
+        for value in (exif_data.get_ifd(EXIF_IFD_POINTER).get(EXIF_DATETIME_ORIGINAL),
+                      exif_data.get(EXIF_DATETIME)):
+            if value:
+                creation_date = _parse_exif_datetime(value)
+                if creation_date:
+                    break
+        
+        # Extract GPS coordinates
+        gps_data = exif_data.get_ifd(GPS_IFD_POINTER)
+        if GPS_LATITUDE in gps_data and GPS_LONGITUDE in gps_data:
+            latitude = _convert_gps_to_decimal(
+                gps_data[GPS_LATITUDE], 
+                gps_data.get(GPS_LATITUDE_REF, 'N')
+            )
+            longitude = _convert_gps_to_decimal(
+                gps_data[GPS_LONGITUDE], 
+                gps_data.get(GPS_LONGITUDE_REF, 'E')
+            )
+    
+    return creation_date, latitude, longitude
+
+
+def extract_video_metadata(filepath: Path, mtime: Optional[float] = None) -> FileMetadata:
+    """Extract metadata from video files using ffprobe."""
+    mod_time = _modification_time(filepath, mtime)
+    output = None
+    
+    try:
+        # Use ffprobe to extract metadata
+        result = subprocess.run(FFPROBE_CMD + [str(filepath)], capture_output=True,
+                                timeout=FFPROBE_TIMEOUT)
+        if result.returncode == 0:
+            output = result.stdout
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+        print(f"Warning: Could not extract video metadata from {filepath}: {e}")
+    except FileNotFoundError:
+        print("Warning: ffprobe not found. Video metadata extraction will be limited.")
+    
+    return _parse_ffprobe_output(filepath, mod_time, output)
+
+
+def extract_videos_metadata(filepaths: List[Path],
+                            mtimes: Optional[List[float]] = None,
+                            max_processes: int = MAX_FFPROBE_PROCESSES) -> List[FileMetadata]:
+    """
+    Extract metadata from many video files, running ffprobe concurrently.
+    
+    Each probe is a short-lived subprocess that mostly waits on I/O, so up
+    to max_processes of them are kept in flight with asyncio rather than
+    spawned one after another.
+    """
+    mtimes = mtimes or [None] * len(filepaths)
+    
+    # Look ffprobe up once instead of failing to spawn it for every video
+    if shutil.which(FFPROBE_CMD[0]) is None:
+        print("Warning: ffprobe not found. Video metadata extraction will be limited.")
+        return [_parse_ffprobe_output(p, _modification_time(p, mtime), None)
+                for p, mtime in zip(filepaths, mtimes)]
+    
+    async def probe_all():
+        semaphore = asyncio.Semaphore(max_processes)
+        return await asyncio.gather(*(
+            _probe_video(p, mtime, semaphore)
+            for p, mtime in zip(filepaths, mtimes)
+        ))
+    
+    return asyncio.run(probe_all())
+
+
+async def _probe_video(filepath: Path, mtime: Optional[float],
+                       semaphore: asyncio.Semaphore) -> FileMetadata:
+    """Run ffprobe on one video without blocking the event loop."""
+    mod_time = _modification_time(filepath, mtime)
+    output = None
+    
+    async with semaphore:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *FFPROBE_CMD, str(filepath),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            print("Warning: ffprobe not found. Video metadata extraction will be limited.")
+        else:
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(), FFPROBE_TIMEOUT)
+                if proc.returncode == 0:
+                    output = stdout
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                print(f"Warning: Could not extract video metadata from {filepath}: ffprobe timed out")
+    
+    return _parse_ffprobe_output(filepath, mod_time, output)
+
+
+def _parse_exif_datetime(value: str) -> Optional[datetime]:
+    """
+    Parse an EXIF "YYYY:MM:DD HH:MM:SS" timestamp.
+    
+    The layout is fixed, so slicing is much cheaper than datetime.strptime.
+    Returns None for blank or malformed values.
+    """
+    # Reject other layouts (e.g. ISO dates) that slicing alone would accept
+    if (len(value) < 19 or value[4] != ':' or value[7] != ':'
+            or value[13] != ':' or value[16] != ':'):
+        return None
+    try:
+        return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                        int(value[11:13]), int(value[14:16]), int(value[17:19]))
+    except (ValueError, TypeError, IndexError):
+        return None
+
+
+def _parse_video_datetime(value: str) -> Optional[datetime]:
+    """
+    Parse a container "YYYY-MM-DD HH:MM:SS" or ISO "YYYY-MM-DDTHH:MM:SS" date.
+    
+    Fractional seconds and any timezone suffix are dropped. Date-only values
+    such as "2023-05-01" are rejected rather than read as midnight.
+    """
+    if (not isinstance(value, str) or len(value) < 19 or value[4] != '-' or value[7] != '-'
+            or value[10] not in 'T ' or value[13] != ':' or value[16] != ':'):
+        return None
+    try:
+        return datetime.fromisoformat(value[:19])
+    except ValueError:
+        return None
+
+
+def _modification_time(filepath: Path, mtime: Optional[float]) -> datetime:
+    """Return the file's modification time, only calling stat() if it is not known yet."""
+    if mtime is None:
+        mtime = filepath.stat().st_mtime
+    return datetime.fromtimestamp(mtime)
+
+
+def _read_exiftool_response(stdout) -> bytes:
+    """Read one -execute response from a stay_open exiftool, up to its {ready} line."""
+    output = b''
+    while True:
+        line = stdout.readline()
+        if not line:
+            raise OSError("exiftool exited unexpectedly")
+        if line.rstrip() == b'{ready}':
+            return output
+        output += line
+
+
+def _parse_exiftool_output(filepath: Path, mod_time: datetime, output: bytes) -> FileMetadata:
+    """Build FileMetadata from exiftool's -j -n output for a single file."""
+    creation_date = None
+    latitude = None
+    longitude = None
+    
+    try:
+        if output.strip():
+            tags = json_loads(output)[0]
+            
+            # QuickTime/MP4 dates are CreateDate; exiftool reports AVI (IDIT)
+            # and Matroska (DateUTC) dates as DateTimeOriginal
+            for date_tag in ('CreateDate', 'DateTimeOriginal'):
+                if date_tag in tags:
+                    creation_date = _parse_exif_datetime(str(tags[date_tag]))
+                    if creation_date:
+                        break
+            
+            # -n reports GPS as signed decimal degrees
+            lat = tags.get('GPSLatitude')
+            lon = tags.get('GPSLongitude')
+            if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
+                latitude, longitude = float(lat), float(lon)
+                
+    except (json.JSONDecodeError, IndexError, KeyError) as e:
+        print(f"Warning: Could not extract video metadata from {filepath}: {e}")
+    
+    return FileMetadata(
+        filepath=filepath,
+        modification_time=mod_time,
+        creation_date=creation_date,
+        latitude=latitude,
+        longitude=longitude
+    )
+
+
+def _parse_ffprobe_output(filepath: Path, mod_time: datetime, output: Optional[bytes]) -> FileMetadata:
+    """Build FileMetadata from ffprobe's raw JSON output (None if ffprobe failed)."""
+    creation_date = None
+    latitude = None
+    longitude = None
+    
+    try:
+        if output is not None:
+            metadata = json_loads(output)
+            
+            # Check format tags first
+            format_tags = metadata.get('format', {}).get('tags', {})
+            
+            # Try different creation date fields
+            for date_field in ['creation_time', 'date', 'DATE']:
+                if date_field in format_tags:
+                    creation_date = _parse_video_datetime(format_tags[date_field])
+                    if creation_date:
+                        break
+            
+            # Look for GPS coordinates in various tag formats
+            location_keys = ['location', 'com.apple.quicktime.location.ISO6709']
+            for key in location_keys:
+                if key in format_tags:
+                    location_str = format_tags[key]
+                    coords = _parse_location_string(location_str)
+                    if coords:
+                        latitude, longitude = coords
+                        break
+            
+            # Stream tags are only a fallback, so skip them once the format
+            # tags have provided a location
+            streams = metadata.get('streams', []) if latitude is None else []
+            for stream in streams:
+                stream_tags = stream.get('tags', {})
+                for key in location_keys:
+                    if key in stream_tags:
+                        location_str = stream_tags[key]
+                        coords = _parse_location_string(location_str)
+                        if coords:
+                            latitude, longitude = coords
+                            break
+                if latitude is not None:
+                    break
+                            
+    except json.JSONDecodeError as e:
+        print(f"Warning: Could not extract video metadata from {filepath}: {e}")
+    
+    return FileMetadata(
+        filepath=filepath,
+        modification_time=mod_time,
+        creation_date=creation_date,
+        latitude=latitude,
+        longitude=longitude
+    )
+
+
+def _convert_gps_to_decimal(coords, ref):
+    """Convert GPS coordinates from degrees/minutes/seconds to decimal."""
+    try:
+        if isinstance(coords, (list, tuple)) and len(coords) >= 3:
+            degrees = float(coords[0])
+            minutes = float(coords[1])
+            seconds = float(coords[2])
+            
+            decimal = degrees + minutes/60.0 + seconds/3600.0
+            
+            if ref in ['S', 'W']:
+                decimal = -decimal
+                
+            return decimal
+    except (ValueError, TypeError, IndexError):
+        pass
+    return None
+
+
+def _convert_exifread_gps_to_decimal(coords, ref):
+    """Convert exifread GPS coordinates to decimal."""
+    try:
+        # exifread returns IfdTag objects whose values are Ratio (Fraction)
+        # instances, so use them directly rather than re-parsing str(coords)
+        values = coords.values
+        degrees = values[0].numerator / values[0].denominator
+        minutes = values[1].numerator / values[1].denominator if len(values) > 1 else 0
+        seconds = values[2].numerator / values[2].denominator if len(values) > 2 else 0
+        
+        decimal = degrees + minutes/60.0 + seconds/3600.0
+        
+        if ref in ['S', 'W']:
+            decimal = -decimal
+            
+        return decimal
+    except (ValueError, TypeError, IndexError, AttributeError, ZeroDivisionError):
+        pass
+    return None
+
+
+def _scan_signed_decimal(text: str, start: int) -> Optional[int]:
+    """
+    Scan a signed decimal number ([+-]digits[.digits]) beginning at start.
+    
+    Returns the index just past the number, or None if there isn't one.
+    ISO 6709 strings are short and rigidly formatted, so a direct scan is
+    cheaper than running them through the regex engine.
+    """
+    end = len(text)
+    if start >= end or text[start] not in '+-':
+        return None
+    
+    i = start + 1
+    while i < end and '0' <= text[i] <= '9':
+        i += 1
+    if i == start + 1:
+        return None
+    
+    if i < end and text[i] == '.':
+        i += 1
+        while i < end and '0' <= text[i] <= '9':
+            i += 1
+    return i
+
+
+def _parse_location_string(location_str: str) -> Optional[Tuple[float, float]]:
+    """Parse various location string formats to extract coordinates."""
+    try:
+        # ISO 6709 format: +DDMM.MMMM+DDDMM.MMMM/ or +DD.DDDD-DDD.DDDD/
+        lat_end = _scan_signed_decimal(location_str, 0)
+        lon_end = _scan_signed_decimal(location_str, lat_end) if lat_end else None
+        if lon_end:
+            lat = float(location_str[:lat_end])
+            lon = float(location_str[lat_end:lon_end])
+            return (lat, lon)
+        
+        # Simple decimal format: "lat,lon"
+        simple_match = _SIMPLE_LATLON_RE.match(location_str)
+        if simple_match:
+            lat = float(simple_match.group(1))
+            lon = float(simple_match.group(2))
+            return (lat, lon)
+            
+    except (ValueError, AttributeError):
+        pass
+    
+    return None
+
+
+def _is_other_file(src, dst, dir_fd: Optional[int] = None) -> bool:
+    """Return True if dst already names an entry other than src itself."""
+    try:
+        dst_stat = os.stat(dst, dir_fd=dir_fd, follow_symlinks=False)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src, dir_fd=dir_fd, follow_symlinks=False)
+    return (dst_stat.st_dev, dst_stat.st_ino) != (src_stat.st_dev, src_stat.st_ino)
+
+
+def _is_case_insensitive(directory: str, names: set) -> bool:
+    """
+    Guess whether directory is on a case-insensitive volume (e.g. default
+    APFS or NTFS) by looking an existing entry up under its swapped case.
+    """
+    for name in names:
+        swapped = name.swapcase()
+        if swapped != name:
+            # Both spellings listed means the volume tells them apart
+            return swapped not in names and os.path.lexists(os.path.join(directory, swapped))
+    # Nothing to probe with; assume the stricter behaviour
+    return True
+
+
 class MediaRenamer:
     """
     Main class for extracting metadata and renaming media files.
@@ -53,283 +584,234 @@ class MediaRenamer:
     - Safely renames files with location and timestamp information
     """
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, use_cache: bool = True, jobs: int = 1):
         """
         Initialize the MediaRenamer.
         
         Args:
             dry_run: If True, only show what would be renamed without actual changes
+            use_cache: If True, keep geocoding results in an on-disk cache between runs
+            jobs: Maximum parallel metadata extractions (worker processes and
+                ffprobe instances). Values above 1 start worker processes, which
+                re-import the calling script on macOS and Windows, so callers
+                opting in need an ``if __name__ == "__main__":`` guard
         """
         self.dry_run = dry_run
-        self.geocoder = Nominatim(user_agent="vibe_media_rename_tool")
+        self.jobs = max(1, jobs or 1)
+        self._exiftool = None
         
-    def extract_photo_metadata(self, filepath: Path) -> FileMetadata:
-        """Extract metadata from photo files using PIL and exifread."""
-        mod_time = datetime.fromtimestamp(filepath.stat().st_mtime)
-        creation_date = None
-        latitude = None
-        longitude = None
+        nominatim_kwargs = {'user_agent': "vibe_media_rename_tool"}
+        nominatim_url = os.environ.get(NOMINATIM_URL_ENV)
+        if nominatim_url:
+            # Self-hosted instance: no usage policy, so allow concurrent requests
+            parsed = urlparse(nominatim_url)
+            nominatim_kwargs['domain'] = parsed.netloc + parsed.path.rstrip('/')
+            nominatim_kwargs['scheme'] = parsed.scheme or 'https'
+            self.geocode_workers = 4
+            min_delay = 0.0
+        else:
+            self.geocode_workers = 1
+            min_delay = PUBLIC_NOMINATIM_DELAY
         
-        try:
-            # Try PIL first for basic EXIF
-            with Image.open(filepath) as img:
-                exif_data = img._getexif()
-                
-                if exif_data:
-                    # Extract creation date
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        if tag == "DateTime":
-                            try:
-                                creation_date = datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-                            except ValueError:
-                                pass
-                        elif tag == "DateTimeOriginal":
-                            try:
-                                creation_date = datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-                            except ValueError:
-                                pass
-                        elif tag == "GPSInfo":
-                            gps_data = {}
-                            for gps_tag_id, gps_value in value.items():
-                                gps_tag = GPSTAGS.get(gps_tag_id, gps_tag_id)
-                                gps_data[gps_tag] = gps_value
-                            
-                            # Extract GPS coordinates
-                            if 'GPSLatitude' in gps_data and 'GPSLongitude' in gps_data:
-                                latitude = self._convert_gps_to_decimal(
-                                    gps_data['GPSLatitude'], 
-                                    gps_data.get('GPSLatitudeRef', 'N')
-                                )
-                                longitude = self._convert_gps_to_decimal(
-                                    gps_data['GPSLongitude'], 
-                                    gps_data.get('GPSLongitudeRef', 'E')
-                                )
-            
-            # Fallback to exifread for more detailed extraction
-            if not creation_date or (latitude is None or longitude is None):
-                with open(filepath, 'rb') as f:
-                    tags = exifread.process_file(f)
-                    
-                    # Try different date tags
-                    for date_tag in ['EXIF DateTimeOriginal', 'EXIF DateTime', 'Image DateTime']:
-                        if date_tag in tags and not creation_date:
-                            try:
-                                creation_date = datetime.strptime(str(tags[date_tag]), "%Y:%m:%d %H:%M:%S")
-                                break
-                            except ValueError:
-                                pass
-                    
-                    # GPS extraction with exifread
-                    if latitude is None or longitude is None:
-                        if 'GPS GPSLatitude' in tags and 'GPS GPSLongitude' in tags:
-                            lat_ref = str(tags.get('GPS GPSLatitudeRef', 'N'))
-                            lon_ref = str(tags.get('GPS GPSLongitudeRef', 'E'))
-                            
-                            latitude = self._convert_exifread_gps_to_decimal(
-                                tags['GPS GPSLatitude'], lat_ref
-                            )
-                            longitude = self._convert_exifread_gps_to_decimal(
-                                tags['GPS GPSLongitude'], lon_ref
-                            )
-                            
-        except Exception as e:
-            print(f"Warning: Could not extract metadata from {filepath}: {e}")
-        
-        return FileMetadata(
-            filepath=filepath,
-            modification_time=mod_time,
-            creation_date=creation_date,
-            latitude=latitude,
-            longitude=longitude
+        if RequestsAdapter.is_available:
+            # geopy already defaults to RequestsAdapter (one keep-alive Session)
+            # when requests is installed; it is passed explicitly only to size
+            # the connection pool to the number of geocoding workers
+            nominatim_kwargs['adapter_factory'] = partial(
+                RequestsAdapter, pool_connections=1, pool_maxsize=self.geocode_workers
+            )
+        self.geocoder = Nominatim(**nominatim_kwargs)
+        
+        self._rate_limited_reverse = RateLimiter(
+            self.geocoder.reverse,
+            min_delay_seconds=min_delay,
+            max_retries=2,
+            error_wait_seconds=5,
+            swallow_exceptions=False
         )
+        self._reverse_geocode = lru_cache(maxsize=4096)(self._reverse_geocode)
+        
+        self.geocode_cache = None
+        if use_cache:
+            try:
+                self.geocode_cache = GeocodeCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: Geocode cache unavailable, continuing without it: {e}")
+        
+        self.metadata_cache = None
+        if use_cache:
+            try:
+                self.metadata_cache = MetadataCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: Metadata cache unavailable, continuing without it: {e}")
+        
+    def extract_photo_metadata(self, filepath: Path, mtime: Optional[float] = None) -> FileMetadata:
+        """Extract metadata from photo files using exifread (PIL as a HEIC fallback)."""
+        return extract_photo_metadata(filepath, mtime)
     
-    def extract_video_metadata(self, filepath: Path) -> FileMetadata:
+    def extract_video_metadata(self, filepath: Path, mtime: Optional[float] = None) -> FileMetadata:
         """Extract metadata from video files using ffprobe."""
-        mod_time = datetime.fromtimestamp(filepath.stat().st_mtime)
-        creation_date = None
-        latitude = None
-        longitude = None
+        return extract_video_metadata(filepath, mtime)
+    
+    
+    def _extract_all(self, filepaths: List[Path], mtimes: List[float]) -> List[FileMetadata]:
+        """
+        Extract metadata for every file, preserving input order.
         
-        try:
-            # Use ffprobe to extract metadata
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', '-show_streams', str(filepath)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                metadata = json.loads(result.stdout)
-                
-                # Check format tags first
-                format_tags = metadata.get('format', {}).get('tags', {})
-                
-                # Try different creation date fields
-                for date_field in ['creation_time', 'date', 'DATE']:
-                    if date_field in format_tags:
-                        try:
-                            # Handle different date formats
-                            date_str = format_tags[date_field]
-                            if 'T' in date_str:
-                                # ISO format
-                                date_str = date_str.split('T')[0] + ' ' + date_str.split('T')[1].split('.')[0]
-                                creation_date = datetime.fromisoformat(date_str.replace('Z', ''))
-                            else:
-                                creation_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                            break
-                        except (ValueError, TypeError):
-                            pass
-                
-                # Look for GPS coordinates in various tag formats
-                location_keys = ['location', 'com.apple.quicktime.location.ISO6709']
-                for key in location_keys:
-                    if key in format_tags:
-                        location_str = format_tags[key]
-                        coords = self._parse_location_string(location_str)
-                        if coords:
-                            latitude, longitude = coords
-                            break
-                
-                # Also check stream metadata
-                for stream in metadata.get('streams', []):
-                    stream_tags = stream.get('tags', {})
-                    for key in location_keys:
-                        if key in stream_tags and not latitude:
-                            location_str = stream_tags[key]
-                            coords = self._parse_location_string(location_str)
-                            if coords:
-                                latitude, longitude = coords
-                                break
-                                
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, json.JSONDecodeError) as e:
-            print(f"Warning: Could not extract video metadata from {filepath}: {e}")
-        except FileNotFoundError:
-            print("Warning: ffprobe not found. Video metadata extraction will be limited.")
+        Photos are decoded in a process pool while videos are handled in
+        this process, overlapping with it. If the pool can't be used (e.g. a
+        "spawn" start method and a calling script without an
+        ``if __name__ == "__main__":`` guard), photos are read in this
+        process instead.
+        """
+        photos = [p for p in filepaths if p.suffix.lower() in PHOTO_EXTENSIONS]
+        videos = [p for p in filepaths if p.suffix.lower() in VIDEO_EXTENSIONS]
+        mtime_by_path = dict(zip(filepaths, mtimes))
+        photo_mtimes = [mtime_by_path[p] for p in photos]
+        video_mtimes = [mtime_by_path[p] for p in videos]
+        workers = min(self.jobs, len(photos))
         
-        return FileMetadata(
-            filepath=filepath,
-            modification_time=mod_time,
-            creation_date=creation_date,
-            latitude=latitude,
-            longitude=longitude
-        )
+        photo_results = None
+        video_results = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    photo_results = executor.map(extract_photo_metadata, photos, photo_mtimes,
+                                                 chunksize=EXTRACT_CHUNKSIZE)
+                    video_results = self._extract_videos(videos, video_mtimes)
+                    photo_results = list(photo_results)
+            except (BrokenProcessPool, RuntimeError, OSError) as e:
+                if multiprocessing.current_process().name != 'MainProcess':
+                    # A spawned worker re-running an unguarded calling script
+                    # fails here, so its copy of the batch never renames files;
+                    # the parent then sees BrokenProcessPool and falls back
+                    raise
+                print(f"Warning: Parallel extraction unavailable, reading photos sequentially: {e}")
+                photo_results = None
+        
+        if photo_results is None:
+            photo_results = [extract_photo_metadata(p, m) for p, m in zip(photos, photo_mtimes)]
+        if video_results is None:
+            video_results = self._extract_videos(videos, video_mtimes)
+        
+        by_path = dict(zip(photos, photo_results))
+        by_path.update(zip(videos, video_results))
+        return [by_path[p] for p in filepaths]
+    
+    def _extract_videos(self, filepaths: List[Path], mtimes: List[float]) -> List[FileMetadata]:
+        """Extract video metadata via batched exiftool, falling back to ffprobe."""
+        if not filepaths:
+            return []
+        
+        results = self._extract_video_metadata_batch(filepaths, mtimes)
+        if results is None:
+            return extract_videos_metadata(filepaths, mtimes, max_processes=self.jobs)
+        
+        # Files exiftool could not read, or found neither a date nor a
+        # location in, get a second look from ffprobe
+        retry = [i for i, metadata in enumerate(results)
+                 if metadata is None or (metadata.creation_date is None and metadata.latitude is None)]
+        if retry:
+            probed = extract_videos_metadata([filepaths[i] for i in retry],
+                                             [mtimes[i] for i in retry],
+                                             max_processes=self.jobs)
+            for i, metadata in zip(retry, probed):
+                if results[i] is None or metadata.creation_date is not None or metadata.latitude is not None:
+                    results[i] = metadata
+        return results
     
-    def _convert_gps_to_decimal(self, coords, ref):
-        """Convert GPS coordinates from degrees/minutes/seconds to decimal."""
+    def _extract_video_metadata_batch(self, filepaths: List[Path],
+                                      mtimes: List[float]) -> Optional[List[Optional[FileMetadata]]]:
+        """
+        Extract video metadata through one long-lived exiftool process.
+        
+        exiftool is started once in -stay_open mode and fed one file per
+        -execute, which avoids paying process start-up for every video.
+        Returns None if exiftool can't be started so the caller can fall back
+        to ffprobe; files whose names cannot be passed to exiftool, or that
+        were not read because exiftool failed or timed out, are left as None
+        in the returned list.
+        """
         try:
-            if isinstance(coords, (list, tuple)) and len(coords) >= 3:
-                degrees = float(coords[0])
-                minutes = float(coords[1])
-                seconds = float(coords[2])
+            if self._exiftool is None or self._exiftool.poll() is not None:
+                self._exiftool = subprocess.Popen(
+                    EXIFTOOL_CMD,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Warning: exiftool failed, falling back to ffprobe: {e}")
+            return None
+        
+        results: List[Optional[FileMetadata]] = [None] * len(filepaths)
+        # Responses are read on a helper thread so that a file exiftool hangs
+        # on can be given up after EXIFTOOL_TIMEOUT instead of blocking forever
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            for i, (filepath, mtime) in enumerate(zip(filepaths, mtimes)):
+                # Pass the name as raw bytes so names that are not valid UTF-8
+                # survive; absolute paths can't be mistaken for options or
+                # comments, but a line break would split the argument and
+                # exiftool trims surrounding whitespace, so those go to ffprobe
+                name = os.fsencode(os.path.abspath(filepath))
+                if b'\n' in name or b'\r' in name or name != name.strip():
+                    continue
                 
-                decimal = degrees + minutes/60.0 + seconds/3600.0
+                try:
+                    self._exiftool.stdin.write(b'\n'.join(EXIFTOOL_ARGS + [name, b'-execute']) + b'\n')
+                    self._exiftool.stdin.flush()
+                    output = reader.submit(_read_exiftool_response, self._exiftool.stdout).result(
+                        timeout=EXIFTOOL_TIMEOUT)
+                except FutureTimeoutError:
+                    print(f"Warning: exiftool timed out on {filepath}, falling back to ffprobe")
+                    self._kill_exiftool()
+                    break
+                except OSError as e:
+                    print(f"Warning: exiftool failed, falling back to ffprobe: {e}")
+                    self._kill_exiftool()
+                    break
                 
-                if ref in ['S', 'W']:
-                    decimal = -decimal
-                    
-                return decimal
-        except (ValueError, TypeError, IndexError):
-            pass
-        return None
+                mod_time = _modification_time(filepath, mtime)
+                results[i] = _parse_exiftool_output(filepath, mod_time, output)
+        
+        # Whatever is still None (including the rest of the batch after a
+        # failure) is probed with ffprobe by the caller
+        return results
     
-    def _convert_exifread_gps_to_decimal(self, coords, ref):
-        """Convert exifread GPS coordinates to decimal."""
-        try:
-            # exifread returns IfdTag objects
-            coord_parts = str(coords).replace('[', '').replace(']', '').split(', ')
-            
-            # Parse degrees, minutes, seconds
-            degrees = float(coord_parts[0])
-            minutes = float(coord_parts[1]) if len(coord_parts) > 1 else 0
-            
-            # Seconds might be a fraction
-            seconds = 0
-            if len(coord_parts) > 2:
-                sec_str = coord_parts[2]
-                if '/' in sec_str:
-                    num, den = sec_str.split('/')
-                    seconds = float(num) / float(den)
-                else:
-                    seconds = float(sec_str)
-            
-            decimal = degrees + minutes/60.0 + seconds/3600.0
-            
-            if ref in ['S', 'W']:
-                decimal = -decimal
-                
-            return decimal
-        except (ValueError, TypeError, IndexError):
-            pass
-        return None
+    def _kill_exiftool(self) -> None:
+        """Terminate an unresponsive exiftool process without waiting on it."""
+        exiftool, self._exiftool = self._exiftool, None
+        if exiftool is not None:
+            exiftool.kill()
+            exiftool.wait()
     
-    def _parse_location_string(self, location_str: str) -> Optional[Tuple[float, float]]:
-        """Parse various location string formats to extract coordinates."""
-        try:
-            # ISO 6709 format: +DDMM.MMMM+DDDMM.MMMM/ or +DD.DDDD-DDD.DDDD/
-            iso_match = re.match(r'([+-]\d+\.?\d*)([+-]\d+\.?\d*)', location_str)
-            if iso_match:
-                lat = float(iso_match.group(1))
-                lon = float(iso_match.group(2))
-                return (lat, lon)
-            
-            # Simple decimal format: "lat,lon"
-            simple_match = re.match(r'(-?\d+\.?\d*),\s*(-?\d+\.?\d*)', location_str)
-            if simple_match:
-                lat = float(simple_match.group(1))
-                lon = float(simple_match.group(2))
-                return (lat, lon)
-                
-        except (ValueError, AttributeError):
-            pass
+    def close(self) -> None:
+        """Shut down the background exiftool process, if one was started."""
+        exiftool = getattr(self, '_exiftool', None)
+        if exiftool is None:
+            return
         
-        return None
+        self._exiftool = None
+        try:
+            exiftool.stdin.write(b'-stay_open\nFalse\n')
+            exiftool.stdin.flush()
+            exiftool.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            exiftool.kill()
+            exiftool.wait()
+    
+    def __del__(self):
+        self.close()
     
     def get_location_name(self, latitude: float, longitude: float) -> Optional[str]:
         """Convert coordinates to place name using geocoding."""
         try:
-            location = self.geocoder.reverse(f"{latitude}, {longitude}", timeout=10, language='en')
-            if location and location.raw:
-                address = location.raw.get('address', {})
-                
-                # Extract place components with better fallback logic
-                place = (address.get('attraction') or
-                        address.get('tourism') or 
-                        address.get('village') or 
-                        address.get('hamlet') or 
-                        address.get('suburb') or
-                        address.get('neighbourhood') or
-                        address.get('city_district') or
-                        address.get('quarter') or
-                        address.get('residential') or
-                        address.get('city') or
-                        address.get('town') or
-                        address.get('municipality') or
-                        "Unknown")
-                
-                city = (address.get('city') or 
-                       address.get('town') or 
-                       address.get('municipality') or
-                       address.get('county') or
-                       address.get('administrative_area_level_2') or
-                       "Unknown")
-                
-                state = (address.get('state') or 
-                        address.get('province') or 
-                        address.get('region') or
-                        address.get('administrative_area_level_1') or
-                        "Unknown")
-                
-                country = address.get('country', "Unknown")
-                
-                # Clean up the components - remove Chinese characters and non-ASCII
-                place = self._clean_location_component(place)
-                city = self._clean_location_component(city)
-                state = self._clean_location_component(state)
-                country = self._clean_location_component(country)
-                
-                return f"{place}_{city}_{state}_{country}"
+            address = self._reverse_geocode(round(latitude, GEOCODE_PRECISION),
+                                            round(longitude, GEOCODE_PRECISION))
+            if address:
+                return self._format_location_name(address)
                 
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             print(f"Warning: Geocoding failed: {e}")
@@ -338,24 +820,140 @@ class MediaRenamer:
         
         return None
     
+    def resolve_location_names(self, coords) -> Dict[Tuple[float, float], Optional[str]]:
+        """
+        Geocode a set of unique (latitude, longitude) pairs.
+        
+        Coordinates already in the on-disk cache are answered up front; only
+        the misses go through a thread pool sized for the configured Nominatim
+        instance, with the rate limiter keeping the public service at one
+        request per second.
+        """
+        names = {}
+        pending = []
+        for coord in sorted(coords):
+            address = None
+            if self.geocode_cache is not None:
+                address = self.geocode_cache.get(round(coord[0], GEOCODE_PRECISION),
+                                                 round(coord[1], GEOCODE_PRECISION))
+            if address is not None:
+                # An empty address records a coordinate Nominatim had no result for
+                names[coord] = self._format_location_name(address) if address else None
+            else:
+                pending.append(coord)
+        
+        if names:
+            print(f"Found {len(names)} location(s) in cache, {len(pending)} to look up")
+        if not pending:
+            return names
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.geocode_workers, len(pending))) as executor:
+                names.update(zip(pending, executor.map(lambda c: self.get_location_name(*c), pending)))
+                return names
+        finally:
+            # New cache entries are written in a single transaction per batch
+            if self.geocode_cache is not None:
+                self.geocode_cache.commit()
+    
+    def _reverse_geocode(self, lat_key: float, lon_key: float) -> Optional[Dict]:
+        """
+        Look up the address for a rounded coordinate.
+        
+        Wrapped in an in-memory LRU cache at init; resolve_location_names()
+        has already checked the on-disk cache, so this always asks Nominatim.
+        Coordinates without a result (open sea, remote areas) are stored as
+        an empty address so later runs don't query them again. Errors
+        propagate so that transient failures are neither memoized nor stored.
+        """
+        location = self._rate_limited_reverse(f"{lat_key}, {lon_key}", timeout=10, language='en')
+        if not location or not location.raw:
+            if self.geocode_cache is not None:
+                self.geocode_cache.put(lat_key, lon_key, {})
+            return None
+        
+        address = location.raw.get('address', {})
+        if self.geocode_cache is not None:
+            self.geocode_cache.put(lat_key, lon_key, address)
+        return address
+    
+    def _format_location_name(self, address: Dict) -> str:
+        """Build the Place_City_State_Country string from a Nominatim address."""
+        # Extract place components with better fallback logic
+        place = (address.get('attraction') or
+                address.get('tourism') or 
+                address.get('village') or 
+                address.get('hamlet') or 
+                address.get('suburb') or
+                address.get('neighbourhood') or
+                address.get('city_district') or
+                address.get('quarter') or
+                address.get('residential') or
+                address.get('city') or
+                address.get('town') or
+                address.get('municipality') or
+                "Unknown")
+        
+        city = (address.get('city') or 
+               address.get('town') or 
+               address.get('municipality') or
+               address.get('county') or
+               address.get('administrative_area_level_2') or
+               "Unknown")
+        
+        state = (address.get('state') or 
+                address.get('province') or 
+                address.get('region') or
+                address.get('administrative_area_level_1') or
+                "Unknown")
+        
+        country = address.get('country', "Unknown")
+        
+        # Clean up the components - remove Chinese characters and non-ASCII
+        place = self._clean_location_component(place)
+        city = self._clean_location_component(city)
+        state = self._clean_location_component(state)
+        country = self._clean_location_component(country)
+        
+        return f"{place}_{city}_{state}_{country}"
+    
     def _clean_location_component(self, component: str) -> str:
         """Clean location component to be ASCII and filesystem-safe."""
         if not component or component == "Unknown":
             return "Unknown"
         
-        # Try to keep only ASCII characters
-        try:
-            # Remove non-ASCII characters
-            ascii_component = ''.join(char for char in component if ord(char) < 128)
-            if ascii_component.strip():
-                return self._clean_filename_part(ascii_component.strip())
-        except:
-            pass
+        # Remove non-ASCII characters (encoding with 'ignore' cannot fail)
+        ascii_component = component.encode('ascii', 'ignore').decode('ascii').strip()
+        if ascii_component:
+            return self._clean_filename_part(ascii_component)
         
         return "Unknown"
     
     def apply_location_heuristic(self, files_metadata: List[FileMetadata]) -> List[FileMetadata]:
         """Apply heuristic to assign locations to files without GPS data."""
+        result = list(files_metadata)
+        
+        if np is not None:
+            matches = self._match_nearest_numpy(files_metadata)
+        else:
+            matches = self._match_nearest_bisect(files_metadata)
+        
+        for unlocated, closest_located in matches:
+            # Update the metadata in place with borrowed coordinates
+            unlocated.latitude = closest_located.latitude
+            unlocated.longitude = closest_located.longitude
+            print(f"Applied location heuristic: {unlocated.filepath.name} -> "
+                  f"borrowed coordinates from {closest_located.filepath.name}")
+        
+        return result
+    
+    def _match_nearest_bisect(self, files_metadata: List[FileMetadata]):
+        """
+        Pair each file without GPS data with the closest located file in time.
+        
+        Yields (unlocated, located) pairs within HEURISTIC_MAX_TIME_DIFF in
+        modification-time order; ties go to the earliest located file.
+        """
         # Sort by modification time
         sorted_files = sorted(files_metadata, key=lambda x: x.modification_time)
         
@@ -365,30 +963,67 @@ class MediaRenamer:
         # Files without location data
         unlocated_files = [f for f in sorted_files if f.latitude is None or f.longitude is None]
         
-        result = list(files_metadata)
+        # located_files is sorted, so the closest match is one of the two
+        # neighbours of each unlocated file's insertion point
+        located_times = [f.modification_time for f in located_files]
         
         for unlocated in unlocated_files:
             closest_located = None
             min_time_diff = None
             
-            for located in located_files:
-                time_diff = abs((unlocated.modification_time - located.modification_time).total_seconds())
-                
+            i = bisect.bisect_left(located_times, unlocated.modification_time)
+            if i > 0:
+                # Prefer the earliest of several files sharing the same timestamp
+                left = bisect.bisect_left(located_times, located_times[i - 1])
+                closest_located = located_files[left]
+                min_time_diff = (unlocated.modification_time - located_times[left]).total_seconds()
+            if i < len(located_files):
+                time_diff = (located_times[i] - unlocated.modification_time).total_seconds()
                 if min_time_diff is None or time_diff < min_time_diff:
                     min_time_diff = time_diff
-                    closest_located = located
+                    closest_located = located_files[i]
             
-            if closest_located and min_time_diff <= 3600:  # Within 1 hour
-                # Update the metadata with borrowed coordinates
-                idx = result.index(unlocated)
-                result[idx] = unlocated._replace(
-                    latitude=closest_located.latitude,
-                    longitude=closest_located.longitude
-                )
-                print(f"Applied location heuristic: {unlocated.filepath.name} -> "
-                      f"borrowed coordinates from {closest_located.filepath.name}")
+            if closest_located and min_time_diff <= HEURISTIC_MAX_TIME_DIFF:
+                yield unlocated, closest_located
+    
+    def _match_nearest_numpy(self, files_metadata: List[FileMetadata]):
+        """Vectorized equivalent of _match_nearest_bisect (requires numpy)."""
+        # Struct-of-arrays view of the two fields the search needs; all the
+        # sorting and indexing below works on these instead of the objects.
+        # Times are integer microseconds from a naive epoch, which matches
+        # datetime subtraction exactly and converts several times faster
+        # than building a datetime64 array from datetime objects
+        epoch = datetime(1970, 1, 1)
+        one_us = timedelta(microseconds=1)
+        ts = np.fromiter(((m.modification_time - epoch) // one_us for m in files_metadata),
+                         dtype=np.int64, count=len(files_metadata))
+        has_gps = np.array([m.latitude is not None and m.longitude is not None
+                            for m in files_metadata], dtype=bool)
         
-        return result
+        # Stable sort keeps input order among equal timestamps, like sorted()
+        order = np.argsort(ts, kind='stable')
+        located = order[has_gps[order]]
+        unlocated = order[~has_gps[order]]
+        if not len(located) or not len(unlocated):
+            return
+        
+        ts_loc = ts[located]
+        ts_unloc = ts[unlocated]
+        
+        idx = np.searchsorted(ts_loc, ts_unloc, side='left')
+        left = np.searchsorted(ts_loc, ts_loc[np.maximum(idx - 1, 0)], side='left')
+        right = np.minimum(idx, len(ts_loc) - 1)
+        
+        # Out-of-range neighbours get a gap larger than any real one
+        no_match = np.iinfo(np.int64).max
+        left_diff = np.where(idx > 0, ts_unloc - ts_loc[left], no_match)
+        right_diff = np.where(idx < len(ts_loc), ts_loc[right] - ts_unloc, no_match)
+        
+        nearest = np.where(right_diff < left_diff, right, left)
+        within = np.minimum(left_diff, right_diff) <= HEURISTIC_MAX_TIME_DIFF * 1_000_000
+        
+        for u in np.flatnonzero(within):
+            yield files_metadata[unlocated[u]], files_metadata[located[nearest[u]]]
     
     def generate_new_filename(self, metadata: FileMetadata) -> str:
         """Generate new filename based on metadata."""
@@ -411,35 +1046,18 @@ class MediaRenamer:
         # Clean original name - remove existing location/date prefixes
         clean_original = self._clean_original_filename(original_name)
         
-        new_filename = f"{location_str}_{creation_time}_{clean_original}{extension}"
+        # Ensure filename isn't too long by truncating the original name if
+        # needed; the length is computed up front so the name is built once
+        overrun = (len(location_str) + len(creation_time) + len(clean_original)
+                   + len(extension) + 2 - MAX_FILENAME_LENGTH)
+        if 0 < overrun < len(clean_original):
+            clean_original = clean_original[:-overrun]
         
-        # Ensure filename isn't too long (max 255 chars)
-        if len(new_filename) > 255:
-            # Truncate original name if needed
-            max_original_len = 255 - len(f"{location_str}_{creation_time}_{extension}")
-            if max_original_len > 0:
-                clean_original = clean_original[:max_original_len]
-                new_filename = f"{location_str}_{creation_time}_{clean_original}{extension}"
-        
-        return new_filename
+        return f"{location_str}_{creation_time}_{clean_original}{extension}"
     
     def _clean_original_filename(self, original_name: str) -> str:
         """Clean original filename by removing existing location/date prefixes."""
-        import re
-        
-        cleaned = original_name
-        
-        # Pattern 1: "Location Name_YYYY-MM-DD_" (handles spaces in location)
-        pattern1 = r'^.+?_\d{4}-\d{2}-\d{2}_'
-        cleaned = re.sub(pattern1, '', cleaned)
-        
-        # Pattern 2: "Place_City_State_Country_YYYYMMDD_HHMMSS_"
-        pattern2 = r'^[^_]+_[^_]+_[^_]+_[^_]+_\d{8}_\d{6}_'
-        cleaned = re.sub(pattern2, '', cleaned)
-        
-        # Pattern 3: Just date prefix "YYYYMMDD_HHMMSS_"
-        pattern3 = r'^\d{8}_\d{6}_'
-        cleaned = re.sub(pattern3, '', cleaned)
+        cleaned = _RENAME_PREFIX_RE.sub('', original_name, count=1)
         
         # If we cleaned everything, use the original filename
         if not cleaned.strip():
@@ -450,38 +1068,135 @@ class MediaRenamer:
     def _clean_filename_part(self, part: str) -> str:
         """Clean a part of filename to be filesystem-safe."""
         # Replace problematic characters
-        cleaned = re.sub(r'[<>:"/\\|?*]', '_', part)
-        # Remove multiple underscores
-        cleaned = re.sub(r'_+', '_', cleaned)
+        cleaned = part.translate(_FS_UNSAFE_TABLE)
+        # Remove multiple underscores (runs are short, so this rarely loops more than twice)
+        while '__' in cleaned:
+            cleaned = cleaned.replace('__', '_')
         # Remove leading/trailing underscores and spaces
         cleaned = cleaned.strip('_').strip()
         return cleaned if cleaned else "Unknown"
     
-    def process_files(self, filepaths: List[Path]) -> None:
-        """Process all files and rename them."""
+    def _rename_in_directory(self, directory: str, pairs: List[Tuple[Path, Path]]) -> None:
+        """
+        Apply a batch of renames within one directory.
+        
+        The directory is opened once: renames are made relative to its
+        descriptor where the platform supports it, so the directory path is
+        not resolved again for every file, and it is fsync()ed once after the
+        whole batch so the new entries are durable without paying for a
+        flush per rename. os.rename() silently replaces an existing target on
+        POSIX, so each target is checked again right before its rename.
+        """
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        except OSError:
+            # Directories can't be opened on some platforms (e.g. Windows)
+            dir_fd = None
+        use_dir_fd = (dir_fd is not None and os.rename in os.supports_dir_fd
+                      and os.stat in os.supports_dir_fd)
+        
+        try:
+            for src, dst in pairs:
+                try:
+                    if use_dir_fd:
+                        if _is_other_file(src.name, dst.name, dir_fd):
+                            print(f"Error processing {src.name}: {dst.name} already exists, not overwriting")
+                            continue
+                        os.rename(src.name, dst.name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+                    else:
+                        if _is_other_file(src, dst):
+                            print(f"Error processing {src.name}: {dst.name} already exists, not overwriting")
+                            continue
+                        os.rename(src, dst)
+                except OSError as e:
+                    print(f"Error processing {src.name}: {e}")
+                    continue
+                if self.metadata_cache is not None:
+                    # Cached rows are found by inode, but keep the path
+                    # current so pruning doesn't mistake the file for deleted
+                    self.metadata_cache.rename(os.path.join(directory, src.name),
+                                               os.path.join(directory, dst.name))
+            
+            if dir_fd is not None:
+                try:
+                    os.fsync(dir_fd)
+                except OSError:
+                    pass
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+    
+    def process_files(self, filepaths: List[Path],
+                      stats: Optional[List[os.stat_result]] = None) -> None:
+        """
+        Process all files and rename them.
+        
+        Args:
+            filepaths: Media files to rename
+            stats: stat() results matching filepaths, if the caller already
+                has them (the files are then assumed to exist)
+        """
         print(f"Processing {len(filepaths)} files...")
         
-        # Extract metadata from all files
+        # Extract metadata from all files, reusing cached results for files
+        # that have not changed since an earlier run
         files_metadata = []
+        candidates = []
+        to_extract = []
+        to_extract_stats = []
+        # Parent directory -> its real path, shared with the rename planning
+        real_dirs: Dict[Path, str] = {}
         
-        for filepath in filepaths:
-            if not filepath.exists():
-                print(f"Warning: File not found: {filepath}")
+        for i, filepath in enumerate(filepaths):
+            # Check the extension first so sidecar files (.xmp, .aae, ...)
+            # picked up by a wildcard never cost a stat()
+            suffix = filepath.suffix.lower()
+            if suffix not in PHOTO_EXTENSIONS and suffix not in VIDEO_EXTENSIONS:
+                print(f"Warning: Unsupported file type: {filepath}")
                 continue
-                
-            print(f"Extracting metadata from: {filepath.name}")
             
-            # Determine file type and extract appropriate metadata
-            if filepath.suffix.lower() in ['.jpg', '.jpeg', '.png', '.tiff', '.tif', '.heic']:
-                metadata = self.extract_photo_metadata(filepath)
-            elif filepath.suffix.lower() in ['.mp4', '.mov', '.avi', '.mkv', '.m4v', '.3gp']:
-                metadata = self.extract_video_metadata(filepath)
+            if stats is not None:
+                st = stats[i]
             else:
-                print(f"Warning: Unsupported file type: {filepath}")
-                continue
-                
+                # A single stat() both checks existence and provides the mtime
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    # Missing, unreadable parent, symlink loop, ...: skip just this file
+                    print(f"Warning: File not found: {filepath}")
+                    continue
+            
+            cached = None
+            if self.metadata_cache is not None:
+                cached = self.metadata_cache.get(st)
+            if cached is None:
+                to_extract.append(filepath)
+                to_extract_stats.append(st)
+            candidates.append((filepath, st, cached))
+        
+        extracted = iter(self._extract_all(to_extract, [st.st_mtime for st in to_extract_stats]))
+        for filepath, st, cached in candidates:
+            if cached is not None:
+                print(f"Using cached metadata for: {filepath.name}")
+                metadata = FileMetadata(filepath, datetime.fromtimestamp(st.st_mtime), *cached)
+            else:
+                print(f"Extracted metadata from: {filepath.name}")
+                metadata = next(extracted)
+                # Files without any metadata are not cached, so installing
+                # exiftool/ffprobe later still picks them up
+                if self.metadata_cache is not None and (
+                        metadata.creation_date is not None or metadata.latitude is not None):
+                    directory = real_dirs.get(filepath.parent)
+                    if directory is None:
+                        directory = real_dirs[filepath.parent] = os.path.realpath(filepath.parent)
+                    self.metadata_cache.put(os.path.join(directory, filepath.name), st,
+                                            metadata.creation_date, metadata.latitude,
+                                            metadata.longitude)
             files_metadata.append(metadata)
         
+        if self.metadata_cache is not None:
+            self.metadata_cache.commit()
+        
         if not files_metadata:
             print("No valid files to process.")
             return
@@ -492,46 +1207,96 @@ class MediaRenamer:
         
         # Get location names for files with coordinates
         print("\nResolving coordinates to location names...")
-        for i, metadata in enumerate(files_metadata):
+        # Group by the same ~100 m rounding the geocode caches use, so a burst
+        # of photos from one spot costs a single lookup
+        unique_coords = {
+            (round(m.latitude, GEOCODE_PRECISION), round(m.longitude, GEOCODE_PRECISION))
+            for m in files_metadata
+            if m.latitude is not None and m.longitude is not None
+        }
+        coord_to_name = self.resolve_location_names(unique_coords)
+        
+        for metadata in files_metadata:
             if metadata.latitude is not None and metadata.longitude is not None:
                 print(f"Geocoding {metadata.filepath.name}: {metadata.latitude:.6f}, {metadata.longitude:.6f}")
-                location_name = self.get_location_name(metadata.latitude, metadata.longitude)
+                location_name = coord_to_name[(round(metadata.latitude, GEOCODE_PRECISION),
+                                               round(metadata.longitude, GEOCODE_PRECISION))]
                 if location_name:
                     print(f"  -> {location_name}")
                 else:
                     print(f"  -> Geocoding failed, using Unknown")
-                files_metadata[i] = metadata._replace(location_name=location_name)
+                metadata.location_name = location_name
         
         # Generate new filenames and rename
         print(f"\n{'DRY RUN: ' if self.dry_run else ''}Renaming files...")
         
+        # Renames are planned first and then applied per directory. Each
+        # directory is listed once and the names claimed earlier in the batch
+        # are added to that listing, so collision checks need no stat() calls.
+        # Directories are keyed by their real path so that one directory
+        # reached through different spellings (relative, absolute, symlinked)
+        # shares a single set of claimed names, and names are casefolded on
+        # case-insensitive volumes, where "a.jpg" and "A.JPG" are one file.
+        renames: Dict[str, List[Tuple[Path, Path]]] = {}
+        taken: Dict[str, set] = {}
+        casefold_dirs = set()
+        
         for metadata in files_metadata:
             try:
                 new_filename = self.generate_new_filename(metadata)
-                new_filepath = metadata.filepath.parent / new_filename
                 
-                if new_filepath == metadata.filepath:
+                if new_filename == metadata.filepath.name:
                     print(f"Skipping {metadata.filepath.name} (no change needed)")
                     continue
                 
-                if new_filepath.exists():
+                parent = metadata.filepath.parent
+                directory = real_dirs.get(parent)
+                if directory is None:
+                    directory = real_dirs[parent] = os.path.realpath(parent)
+                
+                names = taken.get(directory)
+                if names is None:
+                    names = set(os.listdir(directory))
+                    if _is_case_insensitive(directory, names):
+                        casefold_dirs.add(directory)
+                        names = {name.casefold() for name in names}
+                    taken[directory] = names
+                fold = str.casefold if directory in casefold_dirs else str
+                
+                if fold(new_filename) in names:
                     print(f"Warning: Target file already exists: {new_filename}")
                     # Add suffix to make unique
                     counter = 1
-                    base_name = new_filepath.stem
-                    extension = new_filepath.suffix
-                    while new_filepath.exists():
+                    base_name, extension = os.path.splitext(new_filename)
+                    while fold(new_filename) in names:
                         new_filename = f"{base_name}_{counter:03d}{extension}"
-                        new_filepath = metadata.filepath.parent / new_filename
                         counter += 1
                 
                 print(f"{'WOULD RENAME' if self.dry_run else 'RENAMING'}: "
                       f"{metadata.filepath.name} -> {new_filename}")
                 
-                if not self.dry_run:
-                    metadata.filepath.rename(new_filepath)
+                names.add(fold(new_filename))
+                renames.setdefault(directory, []).append((metadata.filepath, parent / new_filename))
                     
             except Exception as e:
                 print(f"Error processing {metadata.filepath.name}: {e}")
         
+        if not self.dry_run:
+            for directory, pairs in renames.items():
+                self._rename_in_directory(directory, pairs)
+        
+        if self.metadata_cache is not None:
+            # Forget files that have been deleted or moved away since they
+            # were cached, so the database doesn't grow without bound
+            for metadata in files_metadata:
+                parent = metadata.filepath.parent
+                if parent not in real_dirs:
+                    real_dirs[parent] = os.path.realpath(parent)
+            for directory in set(real_dirs.values()):
+                try:
+                    self.metadata_cache.prune(directory, set(os.listdir(directory)))
+                except OSError:
+                    pass
+            self.metadata_cache.commit()
+        
         print(f"\n{'Dry run' if self.dry_run else 'Processing'} completed!")
\ No newline at end of file